@@ -1,42 +1,47 @@
-use anyhow::{Context, Result, bail};
-use std::path::{Path, PathBuf};
+use anyhow::{Context, Result, anyhow, bail};
+use std::io::Read;
 use std::process::{Child, Command, Stdio};
+use std::thread::JoinHandle;
+
+/// Capture sample rate; Whisper expects 16kHz mono.
+pub const SAMPLE_RATE: usize = 16_000;
 
 /// Handle to an in-progress audio recording via arecord.
+/// Raw PCM is streamed from arecord's stdout into memory, so nothing touches disk.
 pub struct Recording {
     child: Child,
-    path: PathBuf,
+    reader: JoinHandle<std::io::Result<Vec<u8>>>,
 }
 
 impl Recording {
-    /// Start recording audio to a WAV file using arecord.
-    /// Format: 16kHz, mono, S16_LE PCM.
-    pub fn start(output_path: &Path) -> Result<Self> {
-        let child = Command::new("arecord")
-            .args([
-                "-f",
-                "S16_LE",
-                "-r",
-                "16000",
-                "-c",
-                "1",
-                "-t",
-                "wav",
-                output_path.to_str().unwrap_or("recording.wav"),
-            ])
-            .stdout(Stdio::null())
+    /// Start recording raw audio with arecord.
+    /// Format: SAMPLE_RATE (16kHz), mono, S16_LE PCM.
+    pub fn start() -> Result<Self> {
+        let rate = SAMPLE_RATE.to_string();
+        let mut child = Command::new("arecord")
+            .args(["-f", "S16_LE", "-r", rate.as_str(), "-c", "1", "-t", "raw"])
+            .stdout(Stdio::piped())
             .stderr(Stdio::null())
             .spawn()
             .context("Failed to start arecord. Is alsa-utils installed?")?;
 
-        Ok(Self {
-            child,
-            path: output_path.to_path_buf(),
-        })
+        let mut stdout = child
+            .stdout
+            .take()
+            .context("Failed to capture arecord output")?;
+
+        // Drain the pipe continuously so arecord never blocks on a full buffer.
+        let reader = std::thread::spawn(move || {
+            let mut pcm = Vec::new();
+            stdout.read_to_end(&mut pcm)?;
+            Ok(pcm)
+        });
+
+        Ok(Self { child, reader })
     }
 
-    /// Stop recording and return the path to the WAV file.
-    pub fn stop(mut self) -> Result<PathBuf> {
+    /// Stop recording and return the captured samples.
+    pub fn stop(mut self) -> Result<Vec<f32>> {
         // Send SIGTERM for graceful shutdown
         let pid = self.child.id();
         if let Err(e) = nix::sys::signal::kill(
@@ -52,40 +57,26 @@ impl Recording {
             .wait()
             .context("Failed to wait for arecord to stop")?;
 
-        if !self.path.exists() {
-            bail!("Recording file not found: {}", self.path.display());
-        }
+        // arecord has exited, so the reader sees EOF and holds the complete capture.
+        let pcm = self
+            .reader
+            .join()
+            .map_err(|_| anyhow!("Audio reader thread panicked"))?
+            .context("Failed to read audio from arecord")?;
 
-        Ok(self.path)
-    }
+        if pcm.is_empty() {
+            bail!("No audio captured from arecord");
+        }
 
-    /// Get the output file path.
-    pub fn path(&self) -> &Path {
-        &self.path
+        Ok(pcm_s16le_to_f32(&pcm))
     }
 }
 
-/// Create a temporary WAV file path for recording.
-pub fn temp_wav_path() -> Result<PathBuf> {
-    let dir = tempfile::tempdir().context("Failed to create temp dir")?;
-    // We leak the tempdir so it doesn't get cleaned up
-    // The caller is responsible for cleaning up the WAV file
-    let path = dir.path().join("escucha_recording.wav");
-    std::mem::forget(dir);
-    Ok(path)
-}
-
-/// Clean up a recording file.
-pub fn cleanup_recording(path: &Path) {
-    if path.exists()
-        && let Err(e) = std::fs::remove_file(path)
-    {
-        log::warn!("Failed to clean up {}: {e}", path.display());
-    }
-    // Also try to remove the parent temp directory
-    if let Some(parent) = path.parent() {
-        let _ = std::fs::remove_dir(parent);
-    }
+/// Convert little-endian signed 16-bit PCM bytes to f32 samples in [-1, 1).
+pub fn pcm_s16le_to_f32(pcm: &[u8]) -> Vec<f32> {
+    pcm.chunks_exact(2)
+        .map(|b| i16::from_le_bytes([b[0], b[1]]) as f32 / 32768.0)
+        .collect()
 }
 
 /// Check if arecord is available on the system.
@@ -104,26 +95,23 @@ mod tests {
     }
 
     #[test]
-    fn test_temp_wav_path() {
-        let path = temp_wav_path().unwrap();
-        assert!(path.to_string_lossy().contains("escucha_recording.wav"));
-        // Clean up
-        cleanup_recording(&path);
+    fn test_pcm_s16le_to_f32() {
+        let pcm: Vec<u8> = [0i16, 16384, -16384, i16::MIN]
+            .iter()
+            .flat_map(|s| s.to_le_bytes())
+            .collect();
+        let samples = pcm_s16le_to_f32(&pcm);
+        assert_eq!(samples, vec![0.0, 0.5, -0.5, -1.0]);
     }
 
     #[test]
-    fn test_cleanup_nonexistent() {
-        // Should not panic
-        cleanup_recording(Path::new("/tmp/nonexistent_escucha_test.wav"));
+    fn test_pcm_s16le_to_f32_ignores_trailing_byte() {
+        let samples = pcm_s16le_to_f32(&[0x00, 0x40, 0x7f]);
+        assert_eq!(samples, vec![0.5]);
     }
 
     #[test]
-    fn test_cleanup_existing_file() {
-        let dir = tempfile::tempdir().unwrap();
-        let path = dir.path().join("test.wav");
-        std::fs::write(&path, b"fake wav data").unwrap();
-        assert!(path.exists());
-        cleanup_recording(&path);
-        assert!(!path.exists());
+    fn test_pcm_s16le_to_f32_empty() {
+        assert!(pcm_s16le_to_f32(&[]).is_empty());
     }
 }
@@ -43,11 +43,9 @@ use core::pin::Pin;
 use cxx_qt::{CxxQtType, Threading};
 use cxx_qt_lib::QString;
 use std::path::PathBuf;
-use std::sync::Arc;
-use std::sync::atomic::{AtomicBool, Ordering};
 
 use crate::config;
-use crate::service::{ServiceCallbacks, ServiceStatus};
+use crate::service::{ServiceCallbacks, ServiceStatus, ShutdownHandle};
 
 /// Strip "/dev/input/eventN - " prefix, show only the human-readable name.
 pub fn strip_device_prefix(label: &str) -> &str {
@@ -376,7 +374,7 @@ pub struct EscuchaBackendRust {
     is_recording: bool,
     is_stopped: bool,
     is_ready: bool,
-    shutdown_flag: Option<Arc<AtomicBool>>,
+    shutdown: Option<ShutdownHandle>,
 }
 
 impl qobject::EscuchaBackend {
@@ -388,8 +386,8 @@ impl qobject::EscuchaBackend {
     }
 
     pub fn request_shutdown(self: Pin<&mut Self>) {
-        if let Some(flag) = &self.rust().shutdown_flag {
-            flag.store(true, Ordering::Relaxed);
+        if let Some(shutdown) = &self.rust().shutdown {
+            shutdown.request();
         }
     }
 
@@ -517,6 +515,9 @@ fn run_service_thread(qt_thread: cxx_qt::CxxQtThread<qobject::EscuchaBackend>) {
         }
     };
 
+    // Preflight passed, so load the model while the device and paste tools are set up.
+    crate::transcribe::spawn_preload(&settings);
+
     match crate::service::DictationService::new(settings) {
         Ok(service) => {
             let device_label = service.device_label();
@@ -528,15 +529,12 @@ fn run_service_thread(qt_thread: cxx_qt::CxxQtThread<qobject::EscuchaBackend>) {
             });
 
             // Set up shutdown bridge: store the service's shutdown handle into the QObject
-            let svc_shutdown = service.shutdown_handle();
-            let gui_shutdown = svc_shutdown.clone();
+            let gui_shutdown = service.shutdown_handle();
             let _ = qt_thread.queue(move |mut qobject| {
-                qobject.as_mut().rust_mut().shutdown_flag = Some(gui_shutdown);
+                qobject.as_mut().rust_mut().shutdown = Some(gui_shutdown);
             });
 
-            let mut callbacks = BridgeCallbacks {
-                qt_thread: qt_thread.clone(),
-            };
+            let mut callbacks = BridgeCallbacks::new(qt_thread.clone());
             if let Err(e) = service.run_loop(&mut callbacks) {
                 log::error!("Service error: {e}");
             }
@@ -556,13 +554,50 @@ fn run_service_thread(qt_thread: cxx_qt::CxxQtThread<qobject::EscuchaBackend>) {
     }
 }
 
+/// Forwards service updates to the Qt thread.
+/// Identical consecutive status updates are dropped so the UI isn't redrawn for
+/// no change, and nothing more is queued once the backend object is gone.
 struct BridgeCallbacks {
     qt_thread: cxx_qt::CxxQtThread<qobject::EscuchaBackend>,
+    last_status: Option<ServiceStatus>,
+    last_msg: Option<String>,
+    closed: bool,
+}
+
+impl BridgeCallbacks {
+    fn new(qt_thread: cxx_qt::CxxQtThread<qobject::EscuchaBackend>) -> Self {
+        Self {
+            qt_thread,
+            last_status: None,
+            last_msg: None,
+            closed: false,
+        }
+    }
+
+    fn queue<F>(&mut self, f: F)
+    where
+        F: FnOnce(Pin<&mut qobject::EscuchaBackend>) + Send + 'static,
+    {
+        if self.closed {
+            return;
+        }
+        // Queueing only fails once the QObject has been destroyed (window closed)
+        if self.qt_thread.queue(f).is_err() {
+            log::debug!("Backend object destroyed, dropping further UI updates");
+            self.closed = true;
+        }
+    }
 }
 
 impl ServiceCallbacks for BridgeCallbacks {
     fn on_status(&mut self, status: ServiceStatus) {
-        let _ = self.qt_thread.queue(move |mut qobject| {
+        if self.last_status == Some(status) {
+            return;
+        }
+        self.last_status = Some(status);
+        // Status changes rewrite the detail line too
+        self.last_msg = None;
+        self.queue(move |mut qobject| {
             // Reset state booleans
             qobject.as_mut().set_is_recording(false);
             qobject.as_mut().set_is_stopped(false);
@@ -639,8 +674,14 @@ impl ServiceCallbacks for BridgeCallbacks {
     }
 
     fn on_status_msg(&mut self, msg: &str) {
+        if self.last_msg.as_deref() == Some(msg) {
+            return;
+        }
+        self.last_msg = Some(msg.to_string());
+        // The next status update must repaint over this detail, even if unchanged
+        self.last_status = None;
         let msg = msg.to_string();
-        let _ = self.qt_thread.queue(move |mut qobject| {
+        self.queue(move |mut qobject| {
             qobject
                 .as_mut()
                 .set_status_detail(QString::from(msg.as_str()));
@@ -649,7 +690,7 @@ impl ServiceCallbacks for BridgeCallbacks {
 
     fn on_text(&mut self, text: &str) {
         let text = text.to_string();
-        let _ = self.qt_thread.queue(move |mut qobject| {
+        self.queue(move |mut qobject| {
             if text.is_empty() {
                 qobject
                     .as_mut()
@@ -664,7 +705,7 @@ impl ServiceCallbacks for BridgeCallbacks {
 
     fn on_error(&mut self, error: &str) {
         let error = error.to_string();
-        let _ = self.qt_thread.queue(move |mut qobject| {
+        self.queue(move |mut qobject| {
             qobject
                 .as_mut()
                 .error_occurred(QString::from(error.as_str()));
@@ -1,6 +1,9 @@
 use anyhow::{Context, Result};
 use ini::Ini;
+use std::collections::HashMap;
 use std::path::PathBuf;
+use std::sync::{LazyLock, Mutex};
+use std::time::SystemTime;
 
 const SECTION: &str = "escucha";
 
@@ -8,8 +11,14 @@ const SECTION: &str = "escucha";
 pub struct Settings {
     pub key: String,
     pub keyboard_device: String,
+    /// whisper.cpp model name. The default is the 5-bit quantized base.en,
+    /// which is smaller and faster on CPU than `base.en` at similar accuracy.
     pub model: String,
     pub language: String,
+    pub device: String,
+    pub cpu_threads: String,
+    pub beam_size: u32,
+    pub vad_filter: bool,
     pub paste_method: String,
     pub paste_hotkey: String,
     pub clipboard_paste: String,
@@ -23,8 +32,12 @@ impl Default for Settings {
         Self {
             key: "KEY_RIGHTCTRL".into(),
             keyboard_device: "auto".into(),
-            model: "base.en".into(),
+            model: "base.en-q5_1".into(),
             language: "en".into(),
+            device: "auto".into(),
+            cpu_threads: "auto".into(),
+            beam_size: 1,
+            vad_filter: true,
             paste_method: "auto".into(),
             paste_hotkey: "ctrl+v".into(),
             clipboard_paste: "auto".into(),
@@ -67,18 +80,74 @@ fn get_u32_or_default(ini: &Ini, key: &str, default: u32) -> u32 {
         .unwrap_or(default)
 }
 
+fn get_bool_or_default(ini: &Ini, key: &str, default: bool) -> bool {
+    match ini
+        .get_from(Some(SECTION), key)
+        .map(|v| v.trim().to_lowercase())
+        .as_deref()
+    {
+        Some("true" | "on" | "yes" | "1") => true,
+        Some("false" | "off" | "no" | "0") => false,
+        _ => default,
+    }
+}
+
 pub fn load_settings() -> Result<Settings> {
     load_settings_from(config_path())
 }
 
+/// A parsed config file and the mtime and size it was parsed at.
+struct CachedSettings {
+    modified: SystemTime,
+    len: u64,
+    settings: Settings,
+}
+
+/// Parsed config files keyed by path. In practice this holds only `config_path()`.
+static SETTINGS_CACHE: LazyLock<Mutex<HashMap<PathBuf, CachedSettings>>> =
+    LazyLock::new(|| Mutex::new(HashMap::new()));
+
+/// Load settings from `path`, reusing the previous parse while the file is unchanged.
+/// "Unchanged" means same mtime and size, so an edit that keeps the size within
+/// one mtime tick of the filesystem still returns the old settings.
 pub fn load_settings_from(path: PathBuf) -> Result<Settings> {
-    let defaults = Settings::default();
+    let Ok(meta) = std::fs::metadata(&path) else {
+        return Ok(Settings::default());
+    };
+    let modified = meta.modified().ok();
+    let len = meta.len();
+
+    let mut cache = SETTINGS_CACHE.lock().unwrap_or_else(|e| e.into_inner());
+    if let Some(cached) = cache
+        .get(&path)
+        .filter(|c| Some(c.modified) == modified && c.len == len)
+    {
+        return Ok(cached.settings.clone());
+    }
 
-    if !path.exists() {
-        return Ok(defaults);
+    let settings = parse_settings_file(&path)?;
+    match modified {
+        Some(modified) => {
+            cache.insert(
+                path,
+                CachedSettings {
+                    modified,
+                    len,
+                    settings: settings.clone(),
+                },
+            );
+        }
+        None => {
+            cache.remove(&path);
+        }
     }
+    Ok(settings)
+}
 
-    let ini = Ini::load_from_file(&path)
+fn parse_settings_file(path: &std::path::Path) -> Result<Settings> {
+    let defaults = Settings::default();
+
+    let ini = Ini::load_from_file(path)
         .with_context(|| format!("Failed to load config from {}", path.display()))?;
 
     Ok(Settings {
@@ -86,6 +155,10 @@ pub fn load_settings_from(path: PathBuf) -> Result<Settings> {
         keyboard_device: get_or_default(&ini, "keyboard_device", &defaults.keyboard_device),
         model: get_or_default(&ini, "model", &defaults.model),
         language: get_or_default(&ini, "language", &defaults.language),
+        device: get_or_default(&ini, "device", &defaults.device),
+        cpu_threads: get_or_default(&ini, "cpu_threads", &defaults.cpu_threads),
+        beam_size: get_u32_or_default(&ini, "beam_size", defaults.beam_size),
+        vad_filter: get_bool_or_default(&ini, "vad_filter", defaults.vad_filter),
         paste_method: get_or_default(&ini, "paste_method", &defaults.paste_method),
         paste_hotkey: get_or_default(&ini, "paste_hotkey", &defaults.paste_hotkey),
         clipboard_paste: get_or_default(&ini, "clipboard_paste", &defaults.clipboard_paste),
@@ -117,6 +190,10 @@ pub fn ensure_default_config() -> Result<PathBuf> {
         .set("keyboard_device", &defaults.keyboard_device)
         .set("model", &defaults.model)
         .set("language", &defaults.language)
+        .set("device", &defaults.device)
+        .set("cpu_threads", &defaults.cpu_threads)
+        .set("beam_size", defaults.beam_size.to_string())
+        .set("vad_filter", defaults.vad_filter.to_string())
         .set("paste_method", &defaults.paste_method)
         .set("paste_hotkey", &defaults.paste_hotkey)
         .set("clipboard_paste", &defaults.clipboard_paste)
@@ -143,8 +220,12 @@ mod tests {
         let s = Settings::default();
         assert_eq!(s.key, "KEY_RIGHTCTRL");
         assert_eq!(s.keyboard_device, "auto");
-        assert_eq!(s.model, "base.en");
+        assert_eq!(s.model, "base.en-q5_1");
         assert_eq!(s.language, "en");
+        assert_eq!(s.device, "auto");
+        assert_eq!(s.cpu_threads, "auto");
+        assert_eq!(s.beam_size, 1);
+        assert!(s.vad_filter);
         assert_eq!(s.paste_method, "auto");
         assert_eq!(s.paste_hotkey, "ctrl+v");
         assert_eq!(s.clipboard_paste, "auto");
@@ -190,6 +271,10 @@ mod tests {
             .set("keyboard_device", "/dev/input/event5")
             .set("model", "small.en")
             .set("language", "es")
+            .set("device", "cpu")
+            .set("cpu_threads", "4")
+            .set("beam_size", "5")
+            .set("vad_filter", "off")
             .set("paste_method", "xdotool")
             .set("paste_hotkey", "ctrl+shift+v")
             .set("clipboard_paste", "off")
@@ -203,6 +288,10 @@ mod tests {
         assert_eq!(settings.keyboard_device, "/dev/input/event5");
         assert_eq!(settings.model, "small.en");
         assert_eq!(settings.language, "es");
+        assert_eq!(settings.device, "cpu");
+        assert_eq!(settings.cpu_threads, "4");
+        assert_eq!(settings.beam_size, 5);
+        assert!(!settings.vad_filter);
         assert_eq!(settings.paste_method, "xdotool");
         assert_eq!(settings.paste_hotkey, "ctrl+shift+v");
         assert_eq!(settings.clipboard_paste, "off");
@@ -225,6 +314,53 @@ mod tests {
         assert_eq!(settings.clipboard_paste_delay_ms, 75);
     }
 
+    #[test]
+    fn test_invalid_bool_falls_back_to_default() {
+        let dir = TempDir::new().unwrap();
+        let path = dir.path().join("config.ini");
+
+        let mut ini = Ini::new();
+        ini.with_section(Some(SECTION)).set("vad_filter", "maybe");
+        ini.write_to_file(&path).unwrap();
+
+        let settings = load_settings_from(path).unwrap();
+        assert!(settings.vad_filter);
+    }
+
+    #[test]
+    fn test_rewritten_config_is_reloaded() {
+        let dir = TempDir::new().unwrap();
+        let path = dir.path().join("config.ini");
+        let set_mtime = |time: SystemTime| {
+            std::fs::File::options()
+                .write(true)
+                .open(&path)
+                .unwrap()
+                .set_modified(time)
+                .unwrap();
+        };
+        let first_mtime = SystemTime::UNIX_EPOCH + std::time::Duration::from_secs(1_000_000);
+
+        let mut ini = Ini::new();
+        ini.with_section(Some(SECTION)).set("beam_size", "1");
+        ini.write_to_file(&path).unwrap();
+        set_mtime(first_mtime);
+        assert_eq!(load_settings_from(path.clone()).unwrap().beam_size, 1);
+
+        // Same size, new mtime: the mtime alone invalidates the cache
+        let second_mtime = first_mtime + std::time::Duration::from_secs(1);
+        ini.with_section(Some(SECTION)).set("beam_size", "5");
+        ini.write_to_file(&path).unwrap();
+        set_mtime(second_mtime);
+        assert_eq!(load_settings_from(path.clone()).unwrap().beam_size, 5);
+
+        // Same mtime, new size: the size alone invalidates the cache
+        ini.with_section(Some(SECTION)).set("beam_size", "16");
+        ini.write_to_file(&path).unwrap();
+        set_mtime(second_mtime);
+        assert_eq!(load_settings_from(path).unwrap().beam_size, 16);
+    }
+
     #[test]
     fn test_ensure_default_config_creates_file() {
         let dir = TempDir::new().unwrap();
@@ -244,6 +380,6 @@ mod tests {
         assert!(path.exists());
         let settings = load_settings_from(path).unwrap();
         assert_eq!(settings.key, "KEY_RIGHTCTRL");
-        assert_eq!(settings.model, "base.en");
+        assert_eq!(settings.model, "base.en-q5_1");
     }
 }
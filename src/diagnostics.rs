@@ -337,7 +337,7 @@ fn run_smoke_test(settings: Option<&config::Settings>) -> SmokeTestInfo {
         }
     }
 
-    let mut wav_path: Option<PathBuf> = None;
+    let mut samples: Option<Vec<f32>> = None;
     {
         let start = Instant::now();
         if !audio::check_arecord() {
@@ -348,59 +348,32 @@ fn run_smoke_test(settings: Option<&config::Settings>) -> SmokeTestInfo {
                 start.elapsed(),
             ));
         } else {
-            match audio::temp_wav_path() {
-                Ok(path) => match audio::Recording::start(&path) {
-                    Ok(rec) => {
-                        std::thread::sleep(Duration::from_millis(350));
-                        match rec.stop() {
-                            Ok(recorded) => {
-                                let size = std::fs::metadata(&recorded)
-                                    .map(|m| m.len())
-                                    .unwrap_or_default();
-                                if size > 44 {
-                                    steps.push(step_pass(
-                                        "audio_capture_roundtrip",
-                                        true,
-                                        format!(
-                                            "Captured WAV at {} ({} bytes)",
-                                            recorded.display(),
-                                            size
-                                        ),
-                                        start.elapsed(),
-                                    ));
-                                } else {
-                                    steps.push(step_fail(
-                                        "audio_capture_roundtrip",
-                                        true,
-                                        format!(
-                                            "Recorded WAV too small at {} ({} bytes)",
-                                            recorded.display(),
-                                            size
-                                        ),
-                                        start.elapsed(),
-                                    ));
-                                }
-                                wav_path = Some(recorded);
-                            }
-                            Err(e) => steps.push(step_fail(
+            match audio::Recording::start() {
+                Ok(rec) => {
+                    std::thread::sleep(Duration::from_millis(350));
+                    match rec.stop() {
+                        Ok(captured) => {
+                            let duration_ms = captured.len() * 1000 / audio::SAMPLE_RATE;
+                            steps.push(step_pass(
                                 "audio_capture_roundtrip",
                                 true,
-                                format!("Failed to stop recording: {e}"),
+                                format!("Captured {} samples ({duration_ms} ms)", captured.len()),
                                 start.elapsed(),
-                            )),
+                            ));
+                            samples = Some(captured);
                         }
+                        Err(e) => steps.push(step_fail(
+                            "audio_capture_roundtrip",
+                            true,
+                            format!("Failed to stop recording: {e}"),
+                            start.elapsed(),
+                        )),
                     }
-                    Err(e) => steps.push(step_fail(
-                        "audio_capture_roundtrip",
-                        true,
-                        format!("Failed to start recording: {e}"),
-                        start.elapsed(),
-                    )),
-                },
+                }
                 Err(e) => steps.push(step_fail(
                     "audio_capture_roundtrip",
                     true,
-                    format!("Could not create temp WAV path: {e}"),
+                    format!("Failed to start recording: {e}"),
                     start.elapsed(),
                 )),
             }
@@ -410,10 +383,11 @@ fn run_smoke_test(settings: Option<&config::Settings>) -> SmokeTestInfo {
     {
         let start = Instant::now();
         let model_path = transcribe::model_path(&settings.model);
-        match (&wav_path, model_path.exists()) {
-            (Some(wav), true) => {
-                match transcribe::Transcriber::new(&model_path, &settings.language) {
-                    Ok(transcriber) => match transcriber.transcribe(wav) {
+        match (&samples, model_path.exists()) {
+            (Some(samples), true) => {
+                let transcriber_config = transcribe::TranscriberConfig::from_settings(&settings);
+                match transcribe::Transcriber::new(&model_path, &transcriber_config) {
+                    Ok(transcriber) => match transcriber.transcribe(samples) {
                         Ok(text) => steps.push(step_pass(
                             "transcription_probe",
                             true,
@@ -454,10 +428,6 @@ fn run_smoke_test(settings: Option<&config::Settings>) -> SmokeTestInfo {
         }
     }
 
-    if let Some(path) = wav_path {
-        audio::cleanup_recording(&path);
-    }
-
     let passed = steps
         .iter()
         .filter(|s| s.required)
@@ -10,6 +10,15 @@ pub struct InputDevice {
 
 /// List all /dev/input/event* devices with their names.
 pub fn list_input_devices() -> Result<Vec<InputDevice>> {
+    let devices = scan_input_devices(|_| ())?;
+    Ok(devices.into_iter().map(|(dev, ())| dev).collect())
+}
+
+/// Open each /dev/input/event* device once, record its name and the result of
+/// `probe`, then close it before opening the next one.
+fn scan_input_devices<T>(
+    mut probe: impl FnMut(&evdev::Device) -> T,
+) -> Result<Vec<(InputDevice, T)>> {
     let mut devices = Vec::new();
 
     let entries = std::fs::read_dir("/dev/input").context("Failed to read /dev/input directory")?;
@@ -23,42 +32,33 @@ pub fn list_input_devices() -> Result<Vec<InputDevice>> {
             continue;
         }
 
-        match evdev::Device::open(&path) {
-            Ok(device) => {
-                let name = device.name().unwrap_or("Unknown").to_string();
-                devices.push(InputDevice {
-                    path: path.clone(),
-                    name,
-                });
-            }
-            Err(_) => {
-                // Skip devices we can't open (permission issues)
-                continue;
-            }
-        }
+        // Skip devices we can't open (permission issues)
+        let Ok(device) = evdev::Device::open(&path) else {
+            continue;
+        };
+        let name = device.name().unwrap_or("Unknown").to_string();
+        let probed = probe(&device);
+        devices.push((InputDevice { path, name }, probed));
     }
 
-    devices.sort_by(|a, b| a.path.cmp(&b.path));
+    devices.sort_by(|a, b| a.0.path.cmp(&b.0.path));
     Ok(devices)
 }
 
+/// Whether a device looks like a keyboard rather than a mouse, touchpad, or virtual device.
+fn is_keyboard(device: &InputDevice) -> bool {
+    let exclude_patterns = ["mouse", "touchpad", "trackpoint", "trackball", "virtual"];
+    let lower = device.name.to_lowercase();
+    !exclude_patterns.iter().any(|pat| lower.contains(pat))
+}
+
 /// Filter out mice, touchpads, and virtual devices from device list.
 pub fn filter_keyboards(devices: &[InputDevice]) -> Vec<&InputDevice> {
-    let exclude_patterns = ["mouse", "touchpad", "trackpoint", "trackball", "virtual"];
-    devices
-        .iter()
-        .filter(|d| {
-            let lower = d.name.to_lowercase();
-            !exclude_patterns.iter().any(|pat| lower.contains(pat))
-        })
-        .collect()
+    devices.iter().filter(|d| is_keyboard(d)).collect()
 }
 
 /// Check if a device supports a specific key in its capabilities.
-fn device_supports_key(path: &std::path::Path, key: Key) -> bool {
-    let Ok(device) = evdev::Device::open(path) else {
-        return false;
-    };
+fn device_supports_key(device: &evdev::Device, key: Key) -> bool {
     device
         .supported_keys()
         .is_some_and(|keys| keys.contains(key))
@@ -76,24 +76,24 @@ pub fn pick_keyboard_device(device_setting: &str, key: Key) -> Result<PathBuf> {
         bail!("Configured keyboard device not found: {}", device_setting);
     }
 
-    let devices = list_input_devices()?;
-    let keyboards = filter_keyboards(&devices);
+    // Read names and key support in a single pass so each device is opened once
+    let devices = scan_input_devices(|dev| device_supports_key(dev, key))?;
+    let keyboards: Vec<&(InputDevice, bool)> =
+        devices.iter().filter(|(dev, _)| is_keyboard(dev)).collect();
 
     // First pass: find a keyboard that supports the key
-    for dev in &keyboards {
-        if device_supports_key(&dev.path, key) {
-            log::info!(
-                "Auto-selected device {} ({}) - supports {:?}",
-                dev.path.display(),
-                dev.name,
-                key
-            );
-            return Ok(dev.path.clone());
-        }
+    if let Some((dev, _)) = keyboards.iter().find(|(_, supports_key)| *supports_key) {
+        log::info!(
+            "Auto-selected device {} ({}) - supports {:?}",
+            dev.path.display(),
+            dev.name,
+            key
+        );
+        return Ok(dev.path.clone());
     }
 
     // Fallback: first keyboard device
-    if let Some(dev) = keyboards.first() {
+    if let Some((dev, _)) = keyboards.first() {
         log::warn!(
             "No device explicitly supports {:?}, falling back to {} ({})",
             key,
@@ -1,6 +1,7 @@
 use anyhow::{Context, Result, bail};
+use std::io::Write;
 use std::path::PathBuf;
-use std::process::{Command, Stdio};
+use std::process::{Command, ExitStatus, Stdio};
 
 #[derive(Debug, Clone, Copy, PartialEq)]
 pub enum PasteMethod {
@@ -30,9 +31,71 @@ impl std::fmt::Display for PasteMethod {
 #[derive(Debug, Clone)]
 pub struct PasteConfig {
     pub method: PasteMethod,
-    pub hotkey: String,
+    /// Paste hotkey pre-parsed into arguments for the method's key tool.
+    pub hotkey_args: Vec<String>,
     pub clipboard_paste: String,
     pub clipboard_paste_delay_ms: u32,
+    pub tools: PasteTools,
+}
+
+impl PasteConfig {
+    /// Build the config once at startup: tool paths are resolved and the hotkey
+    /// parsed here so each paste reuses them.
+    pub fn new(
+        method: PasteMethod,
+        hotkey: &str,
+        clipboard_paste: &str,
+        clipboard_paste_delay_ms: u32,
+    ) -> Self {
+        Self {
+            method,
+            hotkey_args: hotkey_args_for(method, hotkey),
+            clipboard_paste: clipboard_paste.to_string(),
+            clipboard_paste_delay_ms,
+            tools: PasteTools::resolve(),
+        }
+    }
+}
+
+/// Paths of the external paste tools, resolved once at startup so each
+/// paste spawns them directly instead of searching PATH again.
+#[derive(Debug, Clone, PartialEq)]
+pub struct PasteTools {
+    pub xdotool: PathBuf,
+    pub xclip: PathBuf,
+    pub wtype: PathBuf,
+    pub ydotool: PathBuf,
+    pub wl_copy: PathBuf,
+}
+
+impl PasteTools {
+    /// Look up each tool on PATH. Missing tools keep their bare name so the
+    /// spawn error still names the tool.
+    pub fn resolve() -> Self {
+        Self {
+            xdotool: resolve_tool("xdotool"),
+            xclip: resolve_tool("xclip"),
+            wtype: resolve_tool("wtype"),
+            ydotool: resolve_tool("ydotool"),
+            wl_copy: resolve_tool("wl-copy"),
+        }
+    }
+}
+
+impl Default for PasteTools {
+    fn default() -> Self {
+        Self {
+            xdotool: "xdotool".into(),
+            xclip: "xclip".into(),
+            wtype: "wtype".into(),
+            ydotool: "ydotool".into(),
+            wl_copy: "wl-copy".into(),
+        }
+    }
+}
+
+fn resolve_tool(name: &str) -> PathBuf {
+    which::which(name).unwrap_or_else(|_| PathBuf::from(name))
 }
 
 /// Auto-detect the best paste method for the current environment.
@@ -78,10 +141,26 @@ fn is_available(cmd: &str) -> bool {
 }
 
 fn ydotool_socket_path_candidates() -> Vec<PathBuf> {
+    ydotool_socket_candidates_from(
+        std::env::var("YDOTOOL_SOCKET").ok(),
+        std::env::var("XDG_RUNTIME_DIR").ok(),
+    )
+}
+
+/// Places ydotoold may listen: an explicit `$YDOTOOL_SOCKET`, the daemon's
+/// default under `$XDG_RUNTIME_DIR` (used by the systemd user unit), and the
+/// legacy `/tmp` path.
+fn ydotool_socket_candidates_from(
+    ydotool_socket: Option<String>,
+    runtime_dir: Option<String>,
+) -> Vec<PathBuf> {
     let mut paths = Vec::new();
-    if let Ok(path) = std::env::var("YDOTOOL_SOCKET") {
+    if let Some(path) = ydotool_socket.filter(|p| !p.is_empty()) {
         paths.push(PathBuf::from(path));
     }
+    if let Some(dir) = runtime_dir.filter(|d| !d.is_empty()) {
+        paths.push(PathBuf::from(dir).join(".ydotool_socket"));
+    }
     paths.push(PathBuf::from("/tmp/.ydotool_socket"));
     paths
 }
@@ -111,6 +190,10 @@ pub fn uinput_accessible() -> bool {
         .is_ok()
 }
 
+/// Upper bound on how long to wait for ydotoold's socket after starting the service.
+const YDOTOOLD_START_TIMEOUT: std::time::Duration = std::time::Duration::from_millis(200);
+const YDOTOOLD_POLL_INTERVAL: std::time::Duration = std::time::Duration::from_millis(10);
+
 /// Best-effort startup of ydotoold for desktop sessions where the user has installed a user unit.
 pub fn ensure_ydotoold_running() -> bool {
     if ydotool_ready() {
@@ -123,7 +206,16 @@ pub fn ensure_ydotoold_running() -> bool {
         // Fallback to a plain start for environments where enable is restricted.
         let _ = run_systemctl_user(["start", "ydotoold.service"]);
     }
-    std::thread::sleep(std::time::Duration::from_millis(200));
+
+    // Return as soon as the daemon's socket shows up rather than always waiting
+    // the full startup budget.
+    let deadline = std::time::Instant::now() + YDOTOOLD_START_TIMEOUT;
+    while std::time::Instant::now() < deadline {
+        if ydotool_socket_available() {
+            return true;
+        }
+        std::thread::sleep(YDOTOOLD_POLL_INTERVAL);
+    }
 
     ydotool_ready()
 }
@@ -208,16 +300,16 @@ pub fn paste_text(text: &str, config: &PasteConfig) -> Result<()> {
         PasteMethod::Xdotool => paste_xdotool(&text, config),
         PasteMethod::Wtype => paste_wtype(&text, config),
         PasteMethod::Ydotool => paste_ydotool(&text, config),
-        PasteMethod::WlCopy => paste_wl_copy_only(&text),
+        PasteMethod::WlCopy => paste_wl_copy_only(&text, config),
     }
 }
 
 fn paste_xdotool(text: &str, config: &PasteConfig) -> Result<()> {
     if should_use_clipboard(&config.clipboard_paste) {
-        clipboard_paste_x11(text, &config.hotkey, config.clipboard_paste_delay_ms)
+        clipboard_paste_x11(text, config)
     } else {
         // Direct typing with xdotool
-        let status = Command::new("xdotool")
+        let status = Command::new(&config.tools.xdotool)
             .args(["type", "--delay", "1", text])
             .status()
             .context("Failed to run xdotool")?;
@@ -231,9 +323,9 @@ fn paste_xdotool(text: &str, config: &PasteConfig) -> Result<()> {
 
 fn paste_wtype(text: &str, config: &PasteConfig) -> Result<()> {
     if should_use_clipboard(&config.clipboard_paste) {
-        clipboard_paste_wayland(text, &config.hotkey, config.clipboard_paste_delay_ms)
+        clipboard_paste_wayland(text, config)
     } else {
-        let status = Command::new("wtype")
+        let status = Command::new(&config.tools.wtype)
             .arg(text)
             .status()
             .context("Failed to run wtype")?;
@@ -241,7 +333,7 @@ fn paste_wtype(text: &str, config: &PasteConfig) -> Result<()> {
         if !status.success() {
             // Fallback to clipboard paste
             log::warn!("wtype direct typing failed, falling back to clipboard paste");
-            clipboard_paste_wayland(text, &config.hotkey, config.clipboard_paste_delay_ms)
+            clipboard_paste_wayland(text, config)
         } else {
             Ok(())
         }
@@ -250,18 +342,20 @@ fn paste_wtype(text: &str, config: &PasteConfig) -> Result<()> {
 
 fn paste_ydotool(text: &str, config: &PasteConfig) -> Result<()> {
     if should_use_clipboard(&config.clipboard_paste) {
-        clipboard_paste_ydotool(text, &config.hotkey, config.clipboard_paste_delay_ms)
+        clipboard_paste_ydotool(text, config)
     } else {
-        // Direct typing with ydotool
-        let status = Command::new("ydotool")
-            .args(["type", text])
-            .status()
-            .context("Failed to run ydotool")?;
+        // Direct typing with ydotool. The text goes over stdin so it is never
+        // parsed as an option (e.g. "-5 degrees") and isn't limited by argv size.
+        let status = run_with_stdin(
+            Command::new(&config.tools.ydotool).args(["type", "--file", "-"]),
+            text,
+        )
+        .context("Failed to run ydotool")?;
 
         if !status.success() {
             // Fallback to clipboard paste
             log::warn!("ydotool direct typing failed, falling back to clipboard paste");
-            clipboard_paste_ydotool(text, &config.hotkey, config.clipboard_paste_delay_ms)
+            clipboard_paste_ydotool(text, config)
         } else {
             Ok(())
         }
@@ -269,8 +363,8 @@ fn paste_ydotool(text: &str, config: &PasteConfig) -> Result<()> {
 }
 
 /// Clipboard-only paste: copies text to clipboard via wl-copy and logs a notice.
-fn paste_wl_copy_only(text: &str) -> Result<()> {
-    let status = Command::new("wl-copy")
+fn paste_wl_copy_only(text: &str, config: &PasteConfig) -> Result<()> {
+    let status = Command::new(&config.tools.wl_copy)
         .arg(text)
         .status()
         .context("Failed to copy to clipboard with wl-copy")?;
@@ -283,34 +377,47 @@ fn paste_wl_copy_only(text: &str) -> Result<()> {
     Ok(())
 }
 
+/// Spawn `cmd` with `input` written to its stdin and wait for it to exit.
+/// A child that exits without reading all of its input reports through its
+/// exit status, so callers can still fall back on failure.
+fn run_with_stdin(cmd: &mut Command, input: &str) -> std::io::Result<ExitStatus> {
+    let mut child = cmd.stdin(Stdio::piped()).spawn()?;
+    // stdin is dropped at the end of this block, closing the pipe
+    let written = match child.stdin.take() {
+        Some(mut stdin) => stdin.write_all(input.as_bytes()),
+        None => Ok(()),
+    };
+    let status = child.wait()?;
+    match written {
+        Err(e) if e.kind() != std::io::ErrorKind::BrokenPipe => Err(e),
+        _ => Ok(status),
+    }
+}
+
 fn should_use_clipboard(setting: &str) -> bool {
     setting == "auto" || setting == "on"
 }
 
-fn clipboard_paste_x11(text: &str, hotkey: &str, delay_ms: u32) -> Result<()> {
+fn clipboard_paste_x11(text: &str, config: &PasteConfig) -> Result<()> {
     // Copy to clipboard using xclip or xsel
-    let status = Command::new("xclip")
-        .args(["-selection", "clipboard"])
-        .stdin(std::process::Stdio::piped())
-        .spawn()
-        .and_then(|mut child| {
-            use std::io::Write;
-            if let Some(stdin) = child.stdin.as_mut() {
-                stdin.write_all(text.as_bytes())?;
-            }
-            child.wait()
-        })
-        .context("Failed to copy to clipboard with xclip")?;
+    let status = run_with_stdin(
+        Command::new(&config.tools.xclip).args(["-selection", "clipboard"]),
+        text,
+    )
+    .context("Failed to copy to clipboard with xclip")?;
 
     if !status.success() {
         bail!("xclip failed");
     }
 
-    std::thread::sleep(std::time::Duration::from_millis(delay_ms as u64));
+    std::thread::sleep(std::time::Duration::from_millis(
+        config.clipboard_paste_delay_ms as u64,
+    ));
 
     // Simulate paste hotkey
-    let status = Command::new("xdotool")
-        .args(["key", hotkey])
+    let status = Command::new(&config.tools.xdotool)
+        .arg("key")
+        .args(&config.hotkey_args)
         .status()
         .context("Failed to simulate paste with xdotool")?;
 
@@ -320,9 +427,9 @@ fn clipboard_paste_x11(text: &str, hotkey: &str, delay_ms: u32) -> Result<()> {
     Ok(())
 }
 
-fn clipboard_paste_wayland(text: &str, hotkey: &str, delay_ms: u32) -> Result<()> {
+fn clipboard_paste_wayland(text: &str, config: &PasteConfig) -> Result<()> {
     // Copy to clipboard using wl-copy
-    let status = Command::new("wl-copy")
+    let status = Command::new(&config.tools.wl_copy)
         .arg(text)
         .status()
         .context("Failed to copy to clipboard with wl-copy")?;
@@ -331,12 +438,13 @@ fn clipboard_paste_wayland(text: &str, hotkey: &str, delay_ms: u32) -> Result<()
         bail!("wl-copy failed");
     }
 
-    std::thread::sleep(std::time::Duration::from_millis(delay_ms as u64));
+    std::thread::sleep(std::time::Duration::from_millis(
+        config.clipboard_paste_delay_ms as u64,
+    ));
 
     // Simulate paste hotkey with wtype
-    let keys = parse_hotkey_to_wtype(hotkey);
-    let status = Command::new("wtype")
-        .args(&keys)
+    let status = Command::new(&config.tools.wtype)
+        .args(&config.hotkey_args)
         .status()
         .context("Failed to simulate paste with wtype")?;
 
@@ -349,9 +457,9 @@ fn clipboard_paste_wayland(text: &str, hotkey: &str, delay_ms: u32) -> Result<()
     Ok(())
 }
 
-fn clipboard_paste_ydotool(text: &str, hotkey: &str, delay_ms: u32) -> Result<()> {
+fn clipboard_paste_ydotool(text: &str, config: &PasteConfig) -> Result<()> {
     // Copy to clipboard using wl-copy
-    let status = Command::new("wl-copy")
+    let status = Command::new(&config.tools.wl_copy)
         .arg(text)
         .status()
         .context("Failed to copy to clipboard with wl-copy")?;
@@ -360,15 +468,16 @@ fn clipboard_paste_ydotool(text: &str, hotkey: &str, delay_ms: u32) -> Result<()
         bail!("wl-copy failed");
     }
 
-    std::thread::sleep(std::time::Duration::from_millis(delay_ms as u64));
+    std::thread::sleep(std::time::Duration::from_millis(
+        config.clipboard_paste_delay_ms as u64,
+    ));
 
     // Simulate paste hotkey with ydotool
     // Format: ydotool key KEYCODE:1 KEYCODE:1 KEYCODE:0 KEYCODE:0
     // where :1 = press, :0 = release
-    let args = parse_hotkey_to_ydotool(hotkey);
-    let status = Command::new("ydotool")
+    let status = Command::new(&config.tools.ydotool)
         .arg("key")
-        .args(&args)
+        .args(&config.hotkey_args)
         .status()
         .context("Failed to simulate paste with ydotool")?;
 
@@ -378,6 +487,16 @@ fn clipboard_paste_ydotool(text: &str, hotkey: &str, delay_ms: u32) -> Result<()
     Ok(())
 }
 
+/// Arguments that press the paste hotkey with the key tool used by `method`.
+fn hotkey_args_for(method: PasteMethod, hotkey: &str) -> Vec<String> {
+    match method {
+        PasteMethod::Xdotool => vec![hotkey.to_string()],
+        PasteMethod::Wtype => parse_hotkey_to_wtype(hotkey),
+        PasteMethod::Ydotool => parse_hotkey_to_ydotool(hotkey),
+        PasteMethod::WlCopy => Vec::new(),
+    }
+}
+
 /// Parse a hotkey like "ctrl+v" or "ctrl+shift+v" to wtype args.
 fn parse_hotkey_to_wtype(hotkey: &str) -> Vec<String> {
     let mut args = Vec::new();
@@ -514,6 +633,41 @@ mod tests {
         );
     }
 
+    #[test]
+    fn test_hotkey_args_for_each_method() {
+        assert_eq!(
+            hotkey_args_for(PasteMethod::Xdotool, "ctrl+v"),
+            vec!["ctrl+v"]
+        );
+        assert_eq!(
+            hotkey_args_for(PasteMethod::Ydotool, "ctrl+v"),
+            vec!["29:1", "47:1", "47:0", "29:0"]
+        );
+        assert_eq!(
+            hotkey_args_for(PasteMethod::Wtype, "ctrl+v"),
+            vec!["-M", "ctrl", "-k", "v", "-m", "ctrl"]
+        );
+        assert!(hotkey_args_for(PasteMethod::WlCopy, "ctrl+v").is_empty());
+    }
+
+    #[test]
+    fn test_run_with_stdin_passes_input() {
+        let status = run_with_stdin(
+            Command::new("sh").args(["-c", "test \"$(cat)\" = '-5 degrees'"]),
+            "-5 degrees",
+        )
+        .unwrap();
+        assert!(status.success());
+    }
+
+    #[test]
+    fn test_run_with_stdin_child_exits_without_reading() {
+        // Larger than a pipe buffer, so the write hits EPIPE once the child exits
+        let input = "x".repeat(1 << 20);
+        let status = run_with_stdin(Command::new("sh").args(["-c", "exit 1"]), &input).unwrap();
+        assert_eq!(status.code(), Some(1));
+    }
+
     #[test]
     fn test_should_use_clipboard() {
         assert!(should_use_clipboard("auto"));
@@ -521,16 +675,50 @@ mod tests {
         assert!(!should_use_clipboard("off"));
     }
 
+    #[test]
+    fn test_ydotool_socket_candidates_include_runtime_dir() {
+        let paths = ydotool_socket_candidates_from(
+            Some("/custom/ydotool.sock".into()),
+            Some("/run/user/1000".into()),
+        );
+        assert_eq!(
+            paths,
+            vec![
+                PathBuf::from("/custom/ydotool.sock"),
+                PathBuf::from("/run/user/1000/.ydotool_socket"),
+                PathBuf::from("/tmp/.ydotool_socket"),
+            ]
+        );
+    }
+
+    #[test]
+    fn test_ydotool_socket_candidates_without_env() {
+        assert_eq!(
+            ydotool_socket_candidates_from(None, Some(String::new())),
+            vec![PathBuf::from("/tmp/.ydotool_socket")]
+        );
+    }
+
     #[test]
     fn test_paste_config_clone() {
         let config = PasteConfig {
             method: PasteMethod::Xdotool,
-            hotkey: "ctrl+v".into(),
+            hotkey_args: vec!["ctrl+v".into()],
             clipboard_paste: "auto".into(),
             clipboard_paste_delay_ms: 75,
+            tools: PasteTools::default(),
         };
         let cloned = config.clone();
         assert_eq!(cloned.method, PasteMethod::Xdotool);
-        assert_eq!(cloned.hotkey, "ctrl+v");
+        assert_eq!(cloned.hotkey_args, vec!["ctrl+v".to_string()]);
+        assert_eq!(cloned.tools, PasteTools::default());
+    }
+
+    #[test]
+    fn test_resolve_tool_missing_keeps_name() {
+        assert_eq!(
+            resolve_tool("escucha-nonexistent-tool"),
+            PathBuf::from("escucha-nonexistent-tool")
+        );
     }
 }
@@ -1,15 +1,17 @@
 use anyhow::{Context, Result};
-use evdev::{EventType, InputEventKind};
+use evdev::EventType;
+use std::io::Read;
+use std::os::fd::AsRawFd;
+use std::os::unix::net::UnixStream;
 use std::path::PathBuf;
-use std::sync::Arc;
-use std::sync::atomic::{AtomicBool, Ordering};
-use std::sync::mpsc;
+use std::sync::atomic::{AtomicBool, AtomicI32, Ordering};
+use std::sync::{Arc, Condvar, Mutex, mpsc};
 
-use crate::audio::{self, Recording};
+use crate::audio::Recording;
 use crate::config::Settings;
 use crate::input;
 use crate::paste::{self, PasteConfig};
-use crate::transcribe::Transcriber;
+use crate::transcribe::{BATCH_GAP_SAMPLES, MAX_BATCH_SAMPLES, Transcriber, TranscriberConfig};
 
 #[derive(Debug, Clone, Copy, PartialEq)]
 pub enum ServiceStatus {
@@ -60,12 +62,163 @@ impl ServiceCallbacks for LogCallbacks {
     }
 }
 
-/// Key events sent from the reader thread.
+/// Events sent to the main loop by the key reader and transcription worker threads.
 #[derive(Debug)]
-enum KeyEvent {
+enum LoopEvent {
     Press,
     Release,
     Error(String),
+    /// Text transcribed by the worker.
+    Text(String),
+    /// A dictation failed in the worker; the service keeps running.
+    JobError(String),
+    /// The worker finished this many dictations.
+    JobsDone(usize),
+    /// Shutdown was requested through a `ShutdownHandle`.
+    Shutdown,
+}
+
+/// Handle for stopping a running service from another thread.
+#[derive(Clone)]
+pub struct ShutdownHandle {
+    requested: Arc<AtomicBool>,
+    /// Sender into the running loop's event channel, so a request wakes it
+    /// immediately instead of waiting for the loop to poll.
+    waker: Arc<Mutex<Option<mpsc::Sender<LoopEvent>>>>,
+}
+
+impl ShutdownHandle {
+    fn new() -> Self {
+        Self {
+            requested: Arc::new(AtomicBool::new(false)),
+            waker: Arc::new(Mutex::new(None)),
+        }
+    }
+
+    /// Ask the service to stop.
+    pub fn request(&self) {
+        self.requested.store(true, Ordering::Relaxed);
+        let waker = self.waker.lock().unwrap_or_else(|e| e.into_inner());
+        if let Some(tx) = waker.as_ref() {
+            let _ = tx.send(LoopEvent::Shutdown);
+        }
+    }
+
+    pub fn is_requested(&self) -> bool {
+        self.requested.load(Ordering::Relaxed)
+    }
+
+    /// Route shutdown requests into the loop's event channel (or stop routing
+    /// them with `None`). A request made before the loop started is delivered now.
+    fn set_waker(&self, tx: Option<mpsc::Sender<LoopEvent>>) {
+        let mut waker = self.waker.lock().unwrap_or_else(|e| e.into_inner());
+        if let Some(tx) = &tx
+            && self.is_requested()
+        {
+            let _ = tx.send(LoopEvent::Shutdown);
+        }
+        *waker = tx;
+    }
+}
+
+/// Holds back pastes while the dictation key is down. The default key is a
+/// modifier (Right Ctrl), so typing text while it is held would turn every
+/// character into a shortcut.
+#[derive(Clone, Default)]
+struct PasteGate {
+    key_held: Arc<(Mutex<bool>, Condvar)>,
+}
+
+impl PasteGate {
+    fn set_key_held(&self, held: bool) {
+        let (lock, cvar) = &*self.key_held;
+        *lock.lock().unwrap_or_else(|e| e.into_inner()) = held;
+        cvar.notify_all();
+    }
+
+    /// Block until the dictation key is released.
+    fn wait_for_key_up(&self) {
+        let (lock, cvar) = &*self.key_held;
+        let held = lock.lock().unwrap_or_else(|e| e.into_inner());
+        let _ = cvar
+            .wait_while(held, |held| *held)
+            .unwrap_or_else(|e| e.into_inner());
+    }
+}
+
+/// Status to show when not recording, given how many dictations are still queued.
+fn idle_status(pending_jobs: usize) -> ServiceStatus {
+    if pending_jobs > 0 {
+        ServiceStatus::Transcribing
+    } else {
+        ServiceStatus::Ready
+    }
+}
+
+/// Take `first` plus any dictations already queued behind it, stopping before
+/// the batch outgrows one Whisper window. The silence inserted between clips
+/// counts toward that window. A clip that doesn't fit is left in `carry` to
+/// start the next batch.
+fn collect_batch(
+    first: Vec<f32>,
+    jobs: &mpsc::Receiver<Vec<f32>>,
+    carry: &mut Option<Vec<f32>>,
+) -> Vec<Vec<f32>> {
+    let mut total = first.len();
+    let mut batch = vec![first];
+    while let Ok(next) = jobs.try_recv() {
+        total += BATCH_GAP_SAMPLES + next.len();
+        if total > MAX_BATCH_SAMPLES {
+            *carry = Some(next);
+            break;
+        }
+        batch.push(next);
+    }
+    batch
+}
+
+/// Transcribe a batch of dictations and paste the result, reporting back to the main loop.
+///
+/// A batch is decoded as one joined clip, so its dictations come back as a single
+/// text and a single paste rather than one callback per dictation; the text can't
+/// be split back per clip without timestamps. If the batch fails, each clip is
+/// retried on its own so one bad dictation doesn't lose the others.
+/// Pasting waits on `gate` while the user is holding the key for the next dictation.
+fn process_dictations(
+    transcriber: &Transcriber,
+    paste_config: &PasteConfig,
+    gate: &PasteGate,
+    clips: &[Vec<f32>],
+    events: &mpsc::Sender<LoopEvent>,
+) {
+    match transcriber.transcribe_batch(clips) {
+        Ok(text) if text.is_empty() => {}
+        Ok(text) => {
+            let _ = events.send(LoopEvent::Text(text.clone()));
+            gate.wait_for_key_up();
+            if let Err(e) = paste::paste_text(&text, paste_config) {
+                let _ = events.send(LoopEvent::JobError(format!("Paste failed: {e}")));
+            }
+        }
+        Err(e) if clips.len() > 1 => {
+            log::warn!(
+                "Batch of {} dictations failed ({e}), retrying one at a time",
+                clips.len()
+            );
+            for clip in clips {
+                process_dictations(
+                    transcriber,
+                    paste_config,
+                    gate,
+                    std::slice::from_ref(clip),
+                    events,
+                );
+            }
+        }
+        Err(e) => {
+            let _ = events.send(LoopEvent::JobError(format!("Transcription failed: {e}")));
+        }
+    }
 }
 
 pub struct DictationService {
@@ -73,7 +226,7 @@ pub struct DictationService {
     device_path: PathBuf,
     key: evdev::Key,
     paste_config: PasteConfig,
-    shutdown: Arc<AtomicBool>,
+    shutdown: ShutdownHandle,
 }
 
 impl DictationService {
@@ -82,12 +235,12 @@ impl DictationService {
         let device_path = input::pick_keyboard_device(&settings.keyboard_device, key)?;
         let paste_method = paste::pick_paste_method(&settings.paste_method)?;
 
-        let paste_config = PasteConfig {
-            method: paste_method,
-            hotkey: settings.paste_hotkey.clone(),
-            clipboard_paste: settings.clipboard_paste.clone(),
-            clipboard_paste_delay_ms: settings.clipboard_paste_delay_ms,
-        };
+        let paste_config = PasteConfig::new(
+            paste_method,
+            &settings.paste_hotkey,
+            &settings.clipboard_paste,
+            settings.clipboard_paste_delay_ms,
+        );
 
         log::info!("Key: {} ({:?})", settings.key, key);
         log::info!("Device: {}", device_path.display());
@@ -99,12 +252,12 @@ impl DictationService {
             device_path,
             key,
             paste_config,
-            shutdown: Arc::new(AtomicBool::new(false)),
+            shutdown: ShutdownHandle::new(),
         })
     }
 
     /// Get a handle to request shutdown.
-    pub fn shutdown_handle(&self) -> Arc<AtomicBool> {
+    pub fn shutdown_handle(&self) -> ShutdownHandle {
         self.shutdown.clone()
     }
 
@@ -130,21 +283,24 @@ impl DictationService {
             })?;
 
         callbacks.on_status_msg("Loading model...");
-        let transcriber = Transcriber::new(&model_path, &self.settings.language)
+        let transcriber_config = TranscriberConfig::from_settings(&self.settings);
+        let transcriber = Transcriber::new(&model_path, &transcriber_config)
             .context("Failed to load Whisper model")?;
 
         // Spawn a dedicated thread to read evdev events.
         // This avoids issues with poll + fetch_events interaction.
-        let (key_tx, key_rx) = mpsc::channel();
+        let (event_tx, event_rx) = mpsc::channel();
+        let worker_tx = event_tx.clone();
+        self.shutdown.set_waker(Some(event_tx.clone()));
         let device_path = self.device_path.clone();
-        let target_key = self.key;
+        let target_code = self.key.code();
         let shutdown_reader = self.shutdown.clone();
 
         std::thread::spawn(move || {
             let mut device = match evdev::Device::open(&device_path) {
                 Ok(d) => d,
                 Err(e) => {
-                    let _ = key_tx.send(KeyEvent::Error(format!(
+                    let _ = event_tx.send(LoopEvent::Error(format!(
                         "Failed to open {}: {e}",
                         device_path.display()
                     )));
@@ -158,121 +314,150 @@ impl DictationService {
                 device.name().unwrap_or("Unknown")
             );
 
-            while !shutdown_reader.load(Ordering::Relaxed) {
+            while !shutdown_reader.is_requested() {
                 // fetch_events blocks until events are available
                 match device.fetch_events() {
                     Ok(events) => {
+                        // One read() drains the kernel buffer; SYN/MSC and other
+                        // keys are rejected on the raw type/code without decoding.
                         for event in events {
-                            if event.event_type() != EventType::KEY {
+                            if event.event_type() != EventType::KEY || event.code() != target_code {
                                 continue;
                             }
-                            if let InputEventKind::Key(key) = event.kind() {
-                                if key != target_key {
-                                    continue;
-                                }
-                                let ke = match event.value() {
-                                    1 => KeyEvent::Press,
-                                    0 => KeyEvent::Release,
-                                    _ => continue, // repeat, ignore
-                                };
-                                if key_tx.send(ke).is_err() {
-                                    return; // main thread gone
-                                }
+                            let ke = match event.value() {
+                                1 => LoopEvent::Press,
+                                0 => LoopEvent::Release,
+                                _ => continue, // repeat, ignore
+                            };
+                            if event_tx.send(ke).is_err() {
+                                return; // main thread gone
                             }
                         }
                     }
                     Err(e) => {
-                        if shutdown_reader.load(Ordering::Relaxed) {
+                        if shutdown_reader.is_requested() {
                             return;
                         }
-                        let _ = key_tx.send(KeyEvent::Error(format!("Event read error: {e}")));
+                        let _ = event_tx.send(LoopEvent::Error(format!("Event read error: {e}")));
                         return;
                     }
                 }
             }
         });
 
+        // Transcribe and paste on a worker thread so the loop keeps handling
+        // key events; a new recording can start while the last one is decoded.
+        let (job_tx, job_rx) = mpsc::channel::<Vec<f32>>();
+        let paste_config = self.paste_config.clone();
+        let paste_gate = PasteGate::default();
+        let worker_gate = paste_gate.clone();
+        let worker = std::thread::spawn(move || {
+            // Warm up here rather than before Ready so key presses are accepted
+            // immediately; a dictation queued meanwhile waits for it to finish.
+            transcriber.warm_up();
+            let mut carry = None;
+            while let Some(first) = carry.take().or_else(|| job_rx.recv().ok()) {
+                let clips = collect_batch(first, &job_rx, &mut carry);
+                if clips.len() > 1 {
+                    log::info!("Transcribing {} queued dictations together", clips.len());
+                }
+                process_dictations(
+                    &transcriber,
+                    &paste_config,
+                    &worker_gate,
+                    &clips,
+                    &worker_tx,
+                );
+                if worker_tx.send(LoopEvent::JobsDone(clips.len())).is_err() {
+                    return;
+                }
+            }
+        });
+
         callbacks.on_status(ServiceStatus::Ready);
         log::info!("Ready. Hold {:?} to dictate.", self.key);
 
         let mut recording: Option<Recording> = None;
+        let mut pending_jobs = 0usize;
 
         loop {
-            // Wait for key events with timeout so we can check shutdown
-            match key_rx.recv_timeout(std::time::Duration::from_millis(500)) {
-                Ok(KeyEvent::Press) => {
+            // Block until the next event; shutdown requests arrive as events too
+            match event_rx.recv() {
+                Ok(LoopEvent::Press) => {
+                    paste_gate.set_key_held(true);
                     if recording.is_some() {
                         continue;
                     }
                     callbacks.on_status(ServiceStatus::Recording);
-                    match audio::temp_wav_path() {
-                        Ok(wav_path) => match Recording::start(&wav_path) {
-                            Ok(rec) => {
-                                log::info!("Recording started");
-                                recording = Some(rec);
-                            }
-                            Err(e) => {
-                                callbacks.on_error(&format!("Failed to start recording: {e}"));
-                                callbacks.on_status(ServiceStatus::Ready);
-                            }
-                        },
+                    match Recording::start() {
+                        Ok(rec) => {
+                            log::info!("Recording started");
+                            recording = Some(rec);
+                        }
                         Err(e) => {
-                            callbacks.on_error(&format!("Failed to create temp file: {e}"));
-                            callbacks.on_status(ServiceStatus::Ready);
+                            callbacks.on_error(&format!("Failed to start recording: {e}"));
+                            callbacks.on_status(idle_status(pending_jobs));
                         }
                     }
                 }
-                Ok(KeyEvent::Release) => {
+                Ok(LoopEvent::Release) => {
+                    paste_gate.set_key_held(false);
                     if let Some(rec) = recording.take() {
-                        callbacks.on_status(ServiceStatus::Transcribing);
                         match rec.stop() {
-                            Ok(wav_path) => {
-                                match transcriber.transcribe(&wav_path) {
-                                    Ok(text) => {
-                                        if !text.is_empty() {
-                                            callbacks.on_text(&text);
-                                            if let Err(e) =
-                                                paste::paste_text(&text, &self.paste_config)
-                                            {
-                                                callbacks.on_error(&format!("Paste failed: {e}"));
-                                            }
-                                        }
-                                    }
-                                    Err(e) => {
-                                        callbacks.on_error(&format!("Transcription failed: {e}"));
-                                    }
+                            Ok(samples) => {
+                                if job_tx.send(samples).is_err() {
+                                    callbacks.on_error("Transcription worker exited");
+                                    break;
                                 }
-                                audio::cleanup_recording(&wav_path);
+                                pending_jobs += 1;
                             }
                             Err(e) => {
                                 callbacks.on_error(&format!("Failed to stop recording: {e}"));
                             }
                         }
-                        callbacks.on_status(ServiceStatus::Ready);
+                        callbacks.on_status(idle_status(pending_jobs));
+                    }
+                }
+                Ok(LoopEvent::Text(text)) => callbacks.on_text(&text),
+                Ok(LoopEvent::JobError(e)) => callbacks.on_error(&e),
+                Ok(LoopEvent::JobsDone(count)) => {
+                    pending_jobs = pending_jobs.saturating_sub(count);
+                    if recording.is_none() {
+                        callbacks.on_status(idle_status(pending_jobs));
                     }
                 }
-                Ok(KeyEvent::Error(e)) => {
+                Ok(LoopEvent::Error(e)) => {
                     callbacks.on_error(&e);
                     break;
                 }
-                Err(mpsc::RecvTimeoutError::Timeout) => {}
-                Err(mpsc::RecvTimeoutError::Disconnected) => {
+                Ok(LoopEvent::Shutdown) => {
+                    callbacks.on_status(ServiceStatus::Stopping);
+                    break;
+                }
+                Err(mpsc::RecvError) => {
                     callbacks.on_error("Event reader thread exited");
                     break;
                 }
             }
+        }
+        self.shutdown.set_waker(None);
+        // Don't leave the worker waiting on a key-up that will never be seen
+        paste_gate.set_key_held(false);
 
-            if self.shutdown.load(Ordering::Relaxed) {
-                callbacks.on_status(ServiceStatus::Stopping);
-                break;
-            }
+        // Stop any in-progress recording
+        if let Some(rec) = recording {
+            let _ = rec.stop();
         }
 
-        // Cleanup any in-progress recording
-        if let Some(rec) = recording
-            && let Ok(path) = rec.stop()
-        {
-            audio::cleanup_recording(&path);
+        // Let queued dictations finish, then report their results
+        drop(job_tx);
+        let _ = worker.join();
+        for event in event_rx.try_iter() {
+            match event {
+                LoopEvent::Text(text) => callbacks.on_text(&text),
+                LoopEvent::JobError(e) => callbacks.on_error(&e),
+                _ => {}
+            }
         }
 
         callbacks.on_status(ServiceStatus::Stopped);
@@ -280,8 +465,8 @@ impl DictationService {
     }
 }
 
-/// Global shutdown flag for signal handler.
-static SHUTDOWN_FLAG: AtomicBool = AtomicBool::new(false);
+/// Write end of the socket pair the signal handler uses to wake the shutdown thread.
+static SIGNAL_WAKE_FD: AtomicI32 = AtomicI32::new(-1);
 
 /// Run as a daemon (default mode).
 pub fn run_daemon() -> Result<()> {
@@ -292,10 +477,21 @@ pub fn run_daemon() -> Result<()> {
         anyhow::bail!("{}", report.critical_failure_summary());
     }
 
-    let service = DictationService::new(settings)?;
+    // Only load the model once preflight passes; it overlaps with device setup.
+    crate::transcribe::spawn_preload(&settings);
 
+    let service = DictationService::new(settings)?;
     let shutdown = service.shutdown_handle();
-    SHUTDOWN_FLAG.store(false, Ordering::Relaxed);
+
+    // The handler only writes a byte (async-signal-safe); a thread blocked on
+    // the other end turns it into a shutdown request, so nothing polls.
+    let (mut signal_rx, signal_tx) =
+        UnixStream::pair().context("Failed to create signal wake-up socket")?;
+    // Never block inside the signal handler, even if the socket buffer is full
+    signal_tx
+        .set_nonblocking(true)
+        .context("Failed to configure signal wake-up socket")?;
+    SIGNAL_WAKE_FD.store(signal_tx.as_raw_fd(), Ordering::Relaxed);
 
     unsafe {
         libc::signal(
@@ -308,23 +504,28 @@ pub fn run_daemon() -> Result<()> {
         );
     }
 
-    let shutdown_clone = shutdown.clone();
     std::thread::spawn(move || {
-        loop {
-            if SHUTDOWN_FLAG.load(Ordering::Relaxed) {
-                shutdown_clone.store(true, Ordering::Relaxed);
-                break;
-            }
-            std::thread::sleep(std::time::Duration::from_millis(100));
+        let mut buf = [0u8; 1];
+        if matches!(signal_rx.read(&mut buf), Ok(n) if n > 0) {
+            shutdown.request();
         }
     });
 
     let mut callbacks = LogCallbacks;
-    service.run_loop(&mut callbacks)
+    let result = service.run_loop(&mut callbacks);
+
+    SIGNAL_WAKE_FD.store(-1, Ordering::Relaxed);
+    drop(signal_tx);
+    result
 }
 
 extern "C" fn signal_handler(_sig: libc::c_int) {
-    SHUTDOWN_FLAG.store(true, Ordering::Relaxed);
+    let fd = SIGNAL_WAKE_FD.load(Ordering::Relaxed);
+    if fd >= 0 {
+        unsafe {
+            libc::write(fd, [1u8].as_ptr().cast(), 1);
+        }
+    }
 }
 
 #[cfg(test)]
@@ -341,6 +542,98 @@ mod tests {
         assert_eq!(ServiceStatus::Stopping.to_string(), "stopping");
     }
 
+    #[test]
+    fn test_idle_status() {
+        assert_eq!(idle_status(0), ServiceStatus::Ready);
+        assert_eq!(idle_status(2), ServiceStatus::Transcribing);
+    }
+
+    #[test]
+    fn test_shutdown_handle_wakes_loop() {
+        let handle = ShutdownHandle::new();
+        let (tx, rx) = mpsc::channel();
+        handle.set_waker(Some(tx));
+        handle.clone().request();
+        assert!(handle.is_requested());
+        assert!(matches!(rx.try_recv(), Ok(LoopEvent::Shutdown)));
+    }
+
+    #[test]
+    fn test_shutdown_requested_before_loop_is_delivered() {
+        let handle = ShutdownHandle::new();
+        handle.request();
+        let (tx, rx) = mpsc::channel();
+        handle.set_waker(Some(tx));
+        assert!(matches!(rx.try_recv(), Ok(LoopEvent::Shutdown)));
+    }
+
+    #[test]
+    fn test_collect_batch_takes_queued_clips() {
+        let (tx, rx) = mpsc::channel();
+        tx.send(vec![0.0; 10]).unwrap();
+        tx.send(vec![0.0; 20]).unwrap();
+        let mut carry = None;
+
+        let batch = collect_batch(vec![0.0; 5], &rx, &mut carry);
+        assert_eq!(batch.len(), 3);
+        assert!(carry.is_none());
+    }
+
+    #[test]
+    fn test_collect_batch_carries_clip_that_does_not_fit() {
+        let (tx, rx) = mpsc::channel();
+        tx.send(vec![0.0; MAX_BATCH_SAMPLES]).unwrap();
+        tx.send(vec![0.0; 10]).unwrap();
+        let mut carry = None;
+
+        let batch = collect_batch(vec![0.0; 10], &rx, &mut carry);
+        assert_eq!(batch.len(), 1);
+        assert_eq!(carry.map(|c| c.len()), Some(MAX_BATCH_SAMPLES));
+        // The clip behind the carried one stays queued for the next batch
+        assert_eq!(rx.try_recv().map(|c| c.len()), Ok(10));
+    }
+
+    #[test]
+    fn test_collect_batch_counts_gaps_between_clips() {
+        // The raw clips fit in one window, but the gap between them does not
+        let half = (MAX_BATCH_SAMPLES - BATCH_GAP_SAMPLES / 2) / 2;
+        assert!(2 * half <= MAX_BATCH_SAMPLES);
+        let (tx, rx) = mpsc::channel();
+        tx.send(vec![0.0; half]).unwrap();
+        let mut carry = None;
+
+        let batch = collect_batch(vec![0.0; half], &rx, &mut carry);
+        assert_eq!(batch.len(), 1);
+        assert_eq!(carry.map(|c| c.len()), Some(half));
+    }
+
+    #[test]
+    fn test_paste_gate_waits_for_key_up() {
+        let gate = PasteGate::default();
+        gate.set_key_held(true);
+
+        let (tx, rx) = mpsc::channel();
+        let waiter = gate.clone();
+        let handle = std::thread::spawn(move || {
+            waiter.wait_for_key_up();
+            tx.send(()).unwrap();
+        });
+
+        assert!(
+            rx.recv_timeout(std::time::Duration::from_millis(50))
+                .is_err()
+        );
+        gate.set_key_held(false);
+        assert!(rx.recv_timeout(std::time::Duration::from_secs(5)).is_ok());
+        handle.join().unwrap();
+    }
+
+    #[test]
+    fn test_paste_gate_open_by_default() {
+        // Must return immediately when the key was never pressed
+        PasteGate::default().wait_for_key_up();
+    }
+
     #[test]
     fn test_service_status_equality() {
         assert_eq!(ServiceStatus::Ready, ServiceStatus::Ready);
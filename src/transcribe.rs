@@ -1,48 +1,146 @@
+use crate::audio;
+use crate::config::Settings;
 use anyhow::{Context, Result};
+use std::collections::HashMap;
 use std::io::Write;
 use std::path::{Path, PathBuf};
+use std::sync::{Arc, LazyLock, Mutex, Once};
 use whisper_rs::{FullParams, SamplingStrategy, WhisperContext, WhisperContextParameters};
 
 const HF_BASE_URL: &str = "https://huggingface.co/ggerganov/whisper.cpp/resolve/main";
 
-pub struct Transcriber {
+/// whisper.cpp skips input shorter than one second, so shorter clips are padded.
+const MIN_AUDIO_SAMPLES: usize = audio::SAMPLE_RATE;
+
+/// whisper.cpp encodes audio in 30-second windows, so clips batched up to this
+/// length share a single encoder pass.
+pub const MAX_BATCH_SAMPLES: usize = audio::SAMPLE_RATE * 30;
+/// Silence inserted between batched clips so words don't run together.
+pub const BATCH_GAP_SAMPLES: usize = audio::SAMPLE_RATE / 5;
+
+/// Silence trimming works on 30ms frames.
+const VAD_FRAME_SAMPLES: usize = audio::SAMPLE_RATE * 30 / 1000;
+/// Audio kept on each side of the detected speech. This only pads the clip's
+/// edges; silence inside the clip is never removed.
+const VAD_PADDING_SAMPLES: usize = audio::SAMPLE_RATE * 300 / 1000;
+/// Frames with RMS below this (about -46 dBFS) count as silence.
+const VAD_RMS_THRESHOLD: f32 = 0.005;
+
+/// Whisper models loaded by this process, keyed by model path and GPU use.
+/// Shared so a service restart (or a preload) doesn't read the model again.
+static MODEL_CACHE: LazyLock<Mutex<HashMap<(PathBuf, bool), Arc<LoadedModel>>>> =
+    LazyLock::new(|| Mutex::new(HashMap::new()));
+
+/// A loaded Whisper context plus whether its warm-up pass has run.
+struct LoadedModel {
     ctx: WhisperContext,
-    language: String,
+    warmed: Once,
+}
+
+/// Model loading and decoding options derived from settings.
+#[derive(Debug, Clone, PartialEq)]
+pub struct TranscriberConfig {
+    pub language: String,
+    pub use_gpu: bool,
+    pub cpu_threads: i32,
+    pub beam_size: i32,
+    pub vad_filter: bool,
+}
+
+impl TranscriberConfig {
+    pub fn from_settings(settings: &Settings) -> Self {
+        let available = std::thread::available_parallelism().map_or(1, |n| n.get());
+        Self {
+            language: settings.language.clone(),
+            use_gpu: resolve_use_gpu(&settings.device),
+            cpu_threads: resolve_cpu_threads(&settings.cpu_threads, available),
+            beam_size: settings.beam_size.clamp(1, 16) as i32,
+            vad_filter: settings.vad_filter,
+        }
+    }
+}
+
+pub struct Transcriber {
+    model: Arc<LoadedModel>,
+    config: TranscriberConfig,
 }
 
 impl Transcriber {
-    /// Load a Whisper model.
-    pub fn new(model_path: &Path, language: &str) -> Result<Self> {
-        let ctx = WhisperContext::new_with_params(
-            model_path.to_str().unwrap_or(""),
-            WhisperContextParameters::default(),
-        )
-        .context("Failed to load Whisper model")?;
+    /// Load a Whisper model, reusing the context if it is already loaded.
+    pub fn new(model_path: &Path, config: &TranscriberConfig) -> Result<Self> {
+        let model = load_model_cached(model_path, config.use_gpu)?;
 
         Ok(Self {
-            ctx,
-            language: language.to_string(),
+            model,
+            config: config.clone(),
         })
     }
 
-    /// Transcribe a WAV file and return the text.
-    pub fn transcribe(&self, wav_path: &Path) -> Result<String> {
-        let audio = load_wav_f32(wav_path)?;
+    /// Run one transcription over silence so the first real dictation doesn't
+    /// pay for whisper.cpp's buffer allocation and first-run kernel setup.
+    /// Runs at most once per loaded model; later calls return immediately.
+    pub fn warm_up(&self) {
+        self.model.warmed.call_once(|| {
+            let silence = vec![0.0f32; audio::SAMPLE_RATE];
+            match self.run_whisper(&silence) {
+                Ok(_) => log::info!("Model warm-up complete"),
+                Err(e) => log::warn!("Model warm-up failed: {e}"),
+            }
+        });
+    }
+
+    /// Transcribe 16kHz mono f32 samples and return the text.
+    pub fn transcribe(&self, audio: &[f32]) -> Result<String> {
+        self.transcribe_batch(&[audio])
+    }
+
+    /// Transcribe several clips in one whisper.cpp pass and return the combined text.
+    /// Timestamps are off, so the text is not split back into per-clip results.
+    /// Every pass pays for a full 30-second encoder window, so dictations that
+    /// queued up back-to-back are cheaper to decode together.
+    pub fn transcribe_batch<C: AsRef<[f32]>>(&self, clips: &[C]) -> Result<String> {
+        let audio = join_clips(clips, self.config.vad_filter);
+        if audio.is_empty() {
+            return Ok(String::new());
+        }
+
+        if audio.len() < MIN_AUDIO_SAMPLES {
+            self.run_whisper(&pad_to_min_length(&audio))
+        } else {
+            self.run_whisper(&audio)
+        }
+    }
+
+    /// Run whisper.cpp over the samples with settings tuned for short dictations:
+    /// no conditioning on earlier text and no timestamp tokens.
+    fn run_whisper(&self, audio: &[f32]) -> Result<String> {
+        let strategy = if self.config.beam_size > 1 {
+            SamplingStrategy::BeamSearch {
+                beam_size: self.config.beam_size,
+                patience: -1.0,
+            }
+        } else {
+            SamplingStrategy::Greedy { best_of: 1 }
+        };
 
-        let mut params = FullParams::new(SamplingStrategy::Greedy { best_of: 1 });
-        params.set_language(Some(&self.language));
+        let mut params = FullParams::new(strategy);
+        params.set_language(Some(&self.config.language));
+        params.set_n_threads(self.config.cpu_threads);
+        params.set_no_context(true);
+        params.set_no_timestamps(true);
         params.set_print_special(false);
         params.set_print_progress(false);
         params.set_print_realtime(false);
         params.set_print_timestamps(false);
 
         let mut state = self
+            .model
             .ctx
             .create_state()
             .context("Failed to create Whisper state")?;
 
         state
-            .full(params, &audio)
+            .full(params, audio)
             .context("Whisper transcription failed")?;
 
         let num_segments = state
@@ -60,48 +158,139 @@ impl Transcriber {
     }
 }
 
-/// Load a WAV file as f32 samples at 16kHz mono.
-fn load_wav_f32(path: &Path) -> Result<Vec<f32>> {
-    let reader = hound::WavReader::open(path)
-        .with_context(|| format!("Failed to open WAV file: {}", path.display()))?;
-
-    let spec = reader.spec();
-    let samples: Vec<f32> = match spec.sample_format {
-        hound::SampleFormat::Int => {
-            let max_val = (1 << (spec.bits_per_sample - 1)) as f32;
-            reader
-                .into_samples::<i32>()
-                .filter_map(|s| s.ok())
-                .map(|s| s as f32 / max_val)
-                .collect()
+/// Get the cached Whisper model, loading it on first use.
+/// The cache lock is held while loading, so a caller racing a preload waits
+/// for it to finish instead of loading the model a second time.
+fn load_model_cached(model_path: &Path, use_gpu: bool) -> Result<Arc<LoadedModel>> {
+    let key = (model_path.to_path_buf(), use_gpu);
+    let mut cache = MODEL_CACHE.lock().unwrap_or_else(|e| e.into_inner());
+    if let Some(model) = cache.get(&key) {
+        return Ok(model.clone());
+    }
+
+    let mut params = WhisperContextParameters::default();
+    params.use_gpu(use_gpu);
+    let ctx = WhisperContext::new_with_params(model_path.to_str().unwrap_or(""), params)
+        .context("Failed to load Whisper model")?;
+    let model = Arc::new(LoadedModel {
+        ctx,
+        warmed: Once::new(),
+    });
+    cache.insert(key, model.clone());
+
+    log::info!(
+        "Loaded model {} ({})",
+        model_path.display(),
+        if use_gpu { "gpu" } else { "cpu" }
+    );
+    Ok(model)
+}
+
+/// Load and warm up the model on a background thread so it is ready before
+/// the first dictation. Models that still need downloading are left to the
+/// service loop, which reports progress.
+pub fn spawn_preload(settings: &Settings) {
+    let path = model_path(&settings.model);
+    if !path.exists() {
+        return;
+    }
+
+    let config = TranscriberConfig::from_settings(settings);
+    std::thread::spawn(move || match Transcriber::new(&path, &config) {
+        Ok(transcriber) => transcriber.warm_up(),
+        Err(e) => log::warn!("Model preload failed: {e}"),
+    });
+}
+
+/// Resolve the `device` setting. "auto" uses the GPU when whisper.cpp was
+/// built with a GPU backend; "cpu" and "gpu" force the choice.
+fn resolve_use_gpu(setting: &str) -> bool {
+    match setting {
+        "cpu" => false,
+        "gpu" | "cuda" => true,
+        "auto" => WhisperContextParameters::default().use_gpu,
+        other => {
+            log::warn!("Unknown device '{other}', using auto");
+            WhisperContextParameters::default().use_gpu
+        }
+    }
+}
+
+/// Resolve the `cpu_threads` setting. "auto" uses half the logical CPUs,
+/// which on SMT machines matches the physical cores whisper.cpp scales with,
+/// but never fewer than whisper.cpp's own default of up to 4 threads.
+fn resolve_cpu_threads(setting: &str, available: usize) -> i32 {
+    let threads = match setting.parse::<usize>() {
+        Ok(n) => n,
+        Err(_) => {
+            if setting != "auto" {
+                log::warn!("Invalid cpu_threads '{setting}', using auto");
+            }
+            (available / 2).max(available.min(4))
         }
-        hound::SampleFormat::Float => reader
-            .into_samples::<f32>()
-            .filter_map(|s| s.ok())
-            .collect(),
     };
+    threads.clamp(1, i32::MAX as usize) as i32
+}
 
-    // If stereo, convert to mono by averaging channels
-    if spec.channels == 2 {
-        let mono: Vec<f32> = samples
-            .chunks(2)
-            .map(|chunk| {
-                if chunk.len() == 2 {
-                    (chunk[0] + chunk[1]) / 2.0
-                } else {
-                    chunk[0]
-                }
-            })
-            .collect();
-        Ok(mono)
-    } else {
-        Ok(samples)
+/// Concatenate clips with a short silence between them, trimming each clip's
+/// own silence first when `vad_filter` is on.
+fn join_clips<C: AsRef<[f32]>>(clips: &[C], vad_filter: bool) -> Vec<f32> {
+    let mut joined = Vec::new();
+    for clip in clips {
+        let clip = clip.as_ref();
+        let clip = if vad_filter { trim_silence(clip) } else { clip };
+        if clip.is_empty() {
+            continue;
+        }
+        if !joined.is_empty() {
+            joined.resize(joined.len() + BATCH_GAP_SAMPLES, 0.0);
+        }
+        joined.extend_from_slice(clip);
     }
+    joined
+}
+
+/// Trim leading and trailing silence, keeping some padding around the speech.
+/// When no frame is loud enough to count as speech the clip is returned whole,
+/// so quiet speakers and low-gain mics still reach whisper instead of being dropped.
+fn trim_silence(audio: &[f32]) -> &[f32] {
+    let Some(first) = audio.chunks(VAD_FRAME_SAMPLES).position(frame_is_voiced) else {
+        log::debug!("No frame above the VAD threshold, keeping clip untrimmed");
+        return audio;
+    };
+    let last = audio
+        .chunks(VAD_FRAME_SAMPLES)
+        .rposition(frame_is_voiced)
+        .unwrap_or(first);
+
+    let start = (first * VAD_FRAME_SAMPLES).saturating_sub(VAD_PADDING_SAMPLES);
+    let end = ((last + 1) * VAD_FRAME_SAMPLES + VAD_PADDING_SAMPLES).min(audio.len());
+    &audio[start..end]
+}
+
+fn frame_is_voiced(frame: &[f32]) -> bool {
+    let energy = frame.iter().map(|s| s * s).sum::<f32>() / frame.len() as f32;
+    energy.sqrt() >= VAD_RMS_THRESHOLD
+}
+
+/// Append silence so the clip is long enough for whisper.cpp to process.
+fn pad_to_min_length(audio: &[f32]) -> Vec<f32> {
+    let mut padded = audio.to_vec();
+    padded.resize(MIN_AUDIO_SAMPLES.max(audio.len()), 0.0);
+    padded
 }
 
 /// Normalize whitespace: trim and collapse multiple spaces.
+/// Builds the result in one pass without collecting the words first.
 pub fn normalize_whitespace(text: &str) -> String {
-    text.split_whitespace().collect::<Vec<_>>().join(" ")
+    let mut normalized = String::with_capacity(text.len());
+    for word in text.split_whitespace() {
+        if !normalized.is_empty() {
+            normalized.push(' ');
+        }
+        normalized.push_str(word);
+    }
+    normalized
 }
 
 /// Get the default model directory path.
@@ -257,75 +446,130 @@ mod tests {
     }
 
     #[test]
-    fn test_model_path() {
-        let path = model_path("base.en");
-        assert!(path.to_string_lossy().contains("ggml-base.en.bin"));
+    fn test_trim_silence_quiet_clip_kept_whole() {
+        let samples = vec![VAD_RMS_THRESHOLD / 2.0; audio::SAMPLE_RATE];
+        assert_eq!(trim_silence(&samples).len(), samples.len());
     }
 
     #[test]
-    fn test_model_url() {
-        let url = model_url("base.en");
-        assert!(url.contains("ggml-base.en.bin"));
-        assert!(url.starts_with("https://huggingface.co/"));
+    fn test_trim_silence_keeps_padding_around_speech() {
+        let mut samples = vec![0.0f32; audio::SAMPLE_RATE * 3];
+        let speech_start = VAD_FRAME_SAMPLES * 40;
+        let speech_end = VAD_FRAME_SAMPLES * 80;
+        for s in &mut samples[speech_start..speech_end] {
+            *s = 0.5;
+        }
+
+        let trimmed = trim_silence(&samples);
+        assert_eq!(
+            trimmed.len(),
+            speech_end - speech_start + 2 * VAD_PADDING_SAMPLES
+        );
     }
 
     #[test]
-    fn test_model_path_large() {
-        let path = model_path("large");
-        assert!(path.to_string_lossy().contains("ggml-large.bin"));
+    fn test_trim_silence_loud_clip_unchanged() {
+        let samples = vec![0.5f32; audio::SAMPLE_RATE / 2];
+        assert_eq!(trim_silence(&samples).len(), samples.len());
     }
 
     #[test]
-    fn test_load_wav_missing_file() {
-        let result = load_wav_f32(Path::new("/tmp/nonexistent.wav"));
-        assert!(result.is_err());
+    fn test_join_clips_inserts_gap() {
+        let joined = join_clips(&[vec![0.5f32; 100], vec![0.25f32; 50]], false);
+        assert_eq!(joined.len(), 100 + BATCH_GAP_SAMPLES + 50);
+        assert_eq!(joined[99], 0.5);
+        assert_eq!(joined[100], 0.0);
+        assert_eq!(joined[100 + BATCH_GAP_SAMPLES], 0.25);
     }
 
     #[test]
-    fn test_load_wav_16bit() {
-        let dir = tempfile::tempdir().unwrap();
-        let path = dir.path().join("test.wav");
-
-        let spec = hound::WavSpec {
-            channels: 1,
-            sample_rate: 16000,
-            bits_per_sample: 16,
-            sample_format: hound::SampleFormat::Int,
-        };
-        let mut writer = hound::WavWriter::create(&path, spec).unwrap();
-        writer.write_sample(0i16).unwrap();
-        writer.write_sample(16383i16).unwrap(); // ~0.5
-        writer.write_sample(-16384i16).unwrap(); // ~-0.5
-        writer.finalize().unwrap();
+    fn test_join_clips_trims_padded_speech() {
+        let mut clip = vec![0.0f32; audio::SAMPLE_RATE * 2];
+        for s in &mut clip[VAD_FRAME_SAMPLES * 40..VAD_FRAME_SAMPLES * 42] {
+            *s = 0.5;
+        }
+        let joined = join_clips(&[&clip[..]], true);
+        assert_eq!(
+            joined.len(),
+            VAD_FRAME_SAMPLES * 2 + 2 * VAD_PADDING_SAMPLES
+        );
+    }
+
+    #[test]
+    fn test_join_clips_keeps_quiet_clips() {
+        let speech = vec![0.5f32; VAD_FRAME_SAMPLES * 2];
+        let quiet = vec![0.0f32; audio::SAMPLE_RATE];
+        let joined = join_clips(&[&quiet[..], &speech[..]], true);
+        assert_eq!(joined.len(), quiet.len() + BATCH_GAP_SAMPLES + speech.len());
+    }
 
-        let samples = load_wav_f32(&path).unwrap();
-        assert_eq!(samples.len(), 3);
-        assert!((samples[0] - 0.0).abs() < 0.01);
-        assert!((samples[1] - 0.5).abs() < 0.01);
-        assert!((samples[2] + 0.5).abs() < 0.01);
+    #[test]
+    fn test_join_clips_single_clip_unchanged() {
+        let joined = join_clips(&[[0.5f32; 10]], false);
+        assert_eq!(joined, vec![0.5f32; 10]);
     }
 
     #[test]
-    fn test_load_wav_stereo_to_mono() {
-        let dir = tempfile::tempdir().unwrap();
-        let path = dir.path().join("test_stereo.wav");
-
-        let spec = hound::WavSpec {
-            channels: 2,
-            sample_rate: 16000,
-            bits_per_sample: 16,
-            sample_format: hound::SampleFormat::Int,
-        };
-        let mut writer = hound::WavWriter::create(&path, spec).unwrap();
-        writer.write_sample(16383i16).unwrap();
-        writer.write_sample(16383i16).unwrap();
-        writer.write_sample(32767i16).unwrap();
-        writer.write_sample(0i16).unwrap();
-        writer.finalize().unwrap();
-
-        let samples = load_wav_f32(&path).unwrap();
-        assert_eq!(samples.len(), 2);
-        assert!((samples[0] - 0.5).abs() < 0.02);
-        assert!((samples[1] - 0.5).abs() < 0.02);
+    fn test_pad_to_min_length() {
+        let padded = pad_to_min_length(&[0.5; 100]);
+        assert_eq!(padded.len(), MIN_AUDIO_SAMPLES);
+        assert_eq!(padded[99], 0.5);
+        assert_eq!(padded[100], 0.0);
+    }
+
+    #[test]
+    fn test_resolve_cpu_threads_auto() {
+        assert_eq!(resolve_cpu_threads("auto", 16), 8);
+        assert_eq!(resolve_cpu_threads("auto", 8), 4);
+        assert_eq!(resolve_cpu_threads("auto", 1), 1);
+    }
+
+    #[test]
+    fn test_resolve_cpu_threads_auto_keeps_whisper_default_floor() {
+        assert_eq!(resolve_cpu_threads("auto", 4), 4);
+        assert_eq!(resolve_cpu_threads("auto", 6), 4);
+        assert_eq!(resolve_cpu_threads("auto", 2), 2);
+    }
+
+    #[test]
+    fn test_resolve_cpu_threads_explicit() {
+        assert_eq!(resolve_cpu_threads("6", 8), 6);
+        assert_eq!(resolve_cpu_threads("0", 8), 1);
+    }
+
+    #[test]
+    fn test_resolve_cpu_threads_invalid_falls_back_to_auto() {
+        assert_eq!(resolve_cpu_threads("lots", 8), 4);
+    }
+
+    #[test]
+    fn test_resolve_use_gpu_explicit() {
+        assert!(!resolve_use_gpu("cpu"));
+        assert!(resolve_use_gpu("gpu"));
+    }
+
+    #[test]
+    fn test_model_path() {
+        let path = model_path("base.en");
+        assert!(path.to_string_lossy().contains("ggml-base.en.bin"));
+    }
+
+    #[test]
+    fn test_model_url() {
+        let url = model_url("base.en");
+        assert!(url.contains("ggml-base.en.bin"));
+        assert!(url.starts_with("https://huggingface.co/"));
+    }
+
+    #[test]
+    fn test_model_url_quantized() {
+        let url = model_url("base.en-q5_1");
+        assert!(url.ends_with("/ggml-base.en-q5_1.bin"));
+    }
+
+    #[test]
+    fn test_model_path_large() {
+        let path = model_path("large");
+        assert!(path.to_string_lossy().contains("ggml-large.bin"));
     }
 }